@@ -15,6 +15,78 @@ import random
 import copy
 import math
 import cmath
+import functools
+import os
+
+
+def _apply_pattern(atoms, vecs, disp_mag, invlavec_t, disp):
+    """
+    Store displacements of a single displacement pattern in disp,
+    which must be zero-initialized and have the shape (nat, 3).
+    When invlavec_t, the transpose of the inverse lattice vector, is given,
+    the displacements are converted from Cartesian to fractional coordinates.
+    """
+    np.add.at(disp, atoms, vecs * disp_mag)
+
+    if invlavec_t is not None:
+        # Convert row by row because a single np.dot over the whole array
+        # rounds differently. Rows of atoms that are not displaced are zero
+        # and are all converted at once.
+        moved = np.unique(atoms)
+        not_moved = np.ones(len(disp), dtype=bool)
+        not_moved[moved] = False
+        disp[not_moved] = np.dot(np.zeros(3), invlavec_t)
+
+        for iat in moved:
+            disp[iat] = np.dot(disp[iat], invlavec_t)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_displacement_patterns(file_stats):
+    """
+    Return the unique displacement patterns in the given pattern files.
+    Each pattern is a tuple (atoms, vecs) of the zero-based indices of the
+    displaced atoms and the corresponding displacement directions.
+    file_stats is a tuple of (absolute path, mtime, size) entries so that a
+    file is parsed again once it has been modified. The returned arrays are
+    shared between calls and are therefore read-only.
+    """
+    patterns = []
+    pattern_seen = set()
+
+    for file, _, _ in file_stats:
+
+        with open(file, 'r') as f:
+            lines = f.read().splitlines()
+
+        tmp, basis = lines[0].rstrip().split(':')
+        if basis == 'F':
+            raise RuntimeError("DBASIS must be 'C'")
+
+        iline = 1
+        while iline < len(lines):
+            line_split_by_colon = lines[iline].rstrip().split(':')
+            is_entry = len(line_split_by_colon) == 2
+            iline += 1
+
+            if is_entry:
+                natom_move = int(line_split_by_colon[1])
+                pattern_set = np.fromstring(" ".join(lines[iline:iline + natom_move]),
+                                            sep=" ").reshape(natom_move, 4)
+                iline += natom_move
+
+                atoms = pattern_set[:, 0].astype(np.int64) - 1
+                # Adding 0.0 maps -0.0 to 0.0 so that both give the same key
+                vecs = pattern_set[:, 1:] + 0.0
+
+                key = atoms.tobytes() + vecs.tobytes()
+                if key not in pattern_seen:
+                    pattern_seen.add(key)
+                    atoms.setflags(write=False)
+                    vecs.setflags(write=False)
+                    patterns.append((atoms, vecs))
+
+    return tuple(patterns)
 
 
 class AlamodeDisplace(object):
@@ -139,8 +211,21 @@ class AlamodeDisplace(object):
                       " the given *.pattern_* files" % len(self._pattern))
                 print("")
 
-            for pattern in self._pattern:
-                header, disp = self._get_finite_displacement(pattern)
+            # No conversion to fractional coordinates is needed for a unit cubic cell
+            invlavec_t = self._supercell.inverse_lattice_vector
+            if invlavec_t is not None:
+                if np.array_equal(invlavec_t, np.identity(3)):
+                    invlavec_t = None
+                else:
+                    # Keep the transposed view. A contiguous copy takes a different
+                    # BLAS path in np.dot and changes the rounding.
+                    invlavec_t = invlavec_t.T
+
+            # Allocate all displacements at once and fill them pattern by pattern
+            disp_all = np.zeros((len(self._pattern), self._supercell.nat, 3))
+
+            for pattern, disp_buf in zip(self._pattern, disp_all):
+                header, disp = self._get_finite_displacement(pattern, invlavec_t, disp_buf)
                 self._counter += 1
                 header_list.append(header)
                 disp_list.append(disp)
@@ -340,68 +425,32 @@ class AlamodeDisplace(object):
         return [start, end, interval]
 
     def _parse_displacement_patterns(self, files_in):
-        self._pattern = []
+        file_stats = tuple((os.path.abspath(file),
+                            os.path.getmtime(file),
+                            os.path.getsize(file)) for file in files_in)
+        self._pattern = list(_load_displacement_patterns(file_stats))
 
-        for file in files_in:
-            pattern_tmp = []
-
-            f = open(file, 'r')
-            tmp, basis = f.readline().rstrip().split(':')
-            if basis == 'F':
-                raise RuntimeError("DBASIS must be 'C'")
-
-            while True:
-                line = f.readline()
-                if not line:
-                    break
+    def _get_finite_displacement(self, pattern, invlavec_t, disp):
 
-                line_split_by_colon = line.rstrip().split(':')
-                is_entry = len(line_split_by_colon) == 2
+        header_parts = ["Disp. Num. %i" % self._counter,
+                        " ( %f Angstrom" % self._displacement_magnitude]
 
-                if is_entry:
-                    pattern_set = []
-                    natom_move = int(line_split_by_colon[1])
-                    for i in range(natom_move):
-                        disp = []
-                        line = f.readline()
-                        line_split = line.rstrip().split()
-                        disp.append(int(line_split[0]))
-                        for j in range(3):
-                            disp.append(float(line_split[j + 1]))
+        atoms, vecs = pattern
 
-                        pattern_set.append(disp)
-                    pattern_tmp.append(pattern_set)
+        for atom, vec in zip(atoms, vecs):
+            header_parts.append(", %i : " % (atom + 1))
 
-            for entry in pattern_tmp:
-                if entry not in self._pattern:
-                    self._pattern.append(entry)
-            f.close()
-
-    def _get_finite_displacement(self, pattern):
-
-        header = "Disp. Num. %i" % self._counter
-        header += " ( %f Angstrom" % self._displacement_magnitude
-        disp = np.zeros((self._supercell.nat, 3))
-
-        for displace in pattern:
-            atom = displace[0] - 1
-            header += ", %i : " % displace[0]
-            str_direction = ""
-
-            for i in range(3):
-                if abs(displace[i + 1]) > 1.0e-10:
-                    if displace[i + 1] > 0.0:
-                        str_direction += "+" + self._char_xyz(i)
+            for i, char_xyz in enumerate("xyz"):
+                if abs(vec[i]) > 1.0e-10:
+                    if vec[i] > 0.0:
+                        header_parts.append("+" + char_xyz)
                     else:
-                        str_direction += "-" + self._char_xyz(i)
+                        header_parts.append("-" + char_xyz)
 
-                disp[atom][i] += displace[i + 1] * self._displacement_magnitude
-            header += str_direction
-        header += ")"
+        header_parts.append(")")
+        header = "".join(header_parts)
 
-        if self._supercell.inverse_lattice_vector is not None:
-            for i in range(self._supercell.nat):
-                disp[i] = np.dot(disp[i], self._supercell.inverse_lattice_vector.T)
+        _apply_pattern(atoms, vecs, self._displacement_magnitude, invlavec_t, disp)
 
         return header, disp
 
@@ -804,12 +853,3 @@ class AlamodeDisplace(object):
         self._qlist_uniq = qlist_uniq
         self._mass = mass
         self._nmode = nmode
-
-    @staticmethod
-    def _char_xyz(entry):
-        if entry % 3 == 0:
-            return 'x'
-        if entry % 3 == 1:
-            return 'y'
-        if entry % 3 == 2:
-            return 'z'
@@ -18,6 +18,7 @@ Input structure file generator for displaced configurations.
 
 from __future__ import print_function
 import argparse
+import sys
 import numpy as np
 from interface.VASP import VaspParser
 from interface.QE import QEParser
@@ -26,6 +27,14 @@ from interface.OpenMX import OpenmxParser
 from interface.LAMMPS import LammpsParser
 from GenDisplacement import AlamodeDisplace
 
+
+def positive_int(value):
+    ivalue = int(value)
+    if ivalue < 1:
+        raise argparse.ArgumentTypeError("%s is not a positive integer" % value)
+    return ivalue
+
+
 parser = argparse.ArgumentParser()
 
 parser.add_argument('--mag',
@@ -121,52 +130,34 @@ parser.add_argument('--imag_evec', action="store_true", dest="imag_evec", defaul
 parser.add_argument('--Qrange', type=str, default=None, metavar='"Qmin Qmax"',
                     help='Range of normal coordinate amplitude Q in units of amu^{1/2}*Angstrom')
 
+parser.add_argument('-np', '--nproc', type=positive_int, default=1,
+                    help="Number of processes used to write the input files (default: 1)")
+
+
+# Output format, file extension, and parser class of each supported code
+code_settings = {"VASP": ("VASP POSCAR", "POSCAR", VaspParser),
+                 "QE": ("Quantum-ESPRESSO pw.in format", "pw.in", QEParser),
+                 "xTAPP": ("xTAPP cg format", "cg", XtappParser),
+                 "LAMMPS": ("LAMMPS structure format", "lammps", LammpsParser),
+                 "OpenMX": ("OpenMX dat format", "dat", OpenmxParser)}
+
 
 def check_code_options(args):
-    conditions = [args.VASP is None,
-                  args.QE is None,
-                  args.xTAPP is None,
-                  args.LAMMPS is None,
-                  args.OpenMX is None]
+    given_codes = [code for code in code_settings if getattr(args, code) is not None]
 
-    if conditions.count(True) == len(conditions):
+    if len(given_codes) == 0:
         raise RuntimeError(
             "Error : Either --VASP, --QE, --xTAPP, --LAMMPS, "
             "--OpenMX option must be given.")
 
-    elif len(conditions) - conditions.count(True) > 1:
+    elif len(given_codes) > 1:
         raise RuntimeError("Error : --VASP, --QE, --xTAPP, --LAMMPS, and "
                            "--OpenMX cannot be given simultaneously.")
 
-    elif args.VASP:
-        code = "VASP"
-        struct_format = "VASP POSCAR"
-        str_outfiles = "%s{counter}.POSCAR" % args.prefix
-        file_original = args.VASP
-
-    elif args.QE:
-        code = "QE"
-        struct_format = "Quantum-ESPRESSO pw.in format"
-        str_outfiles = "%s{counter}.pw.in" % args.prefix
-        file_original = args.QE
-
-    elif args.xTAPP:
-        code = "xTAPP"
-        struct_format = "xTAPP cg format"
-        str_outfiles = "%s{counter}.cg" % args.prefix
-        file_original = args.xTAPP
-
-    elif args.LAMMPS:
-        code = "LAMMPS"
-        struct_format = "LAMMPS structure format"
-        str_outfiles = "%s{counter}.lammps" % args.prefix
-        file_original = args.LAMMPS
-
-    elif args.OpenMX:
-        code = "OpenMX"
-        struct_format = "OpenMX dat format"
-        str_outfiles = "%s{counter}.dat" % args.prefix
-        file_original = args.OpenMX
+    code = given_codes[0]
+    struct_format, suffix, _ = code_settings[code]
+    str_outfiles = "%s{counter}.%s" % (args.prefix, suffix)
+    file_original = getattr(args, code)
 
     return code, file_original, struct_format, str_outfiles
 
@@ -222,20 +213,7 @@ def check_displace_options(args, code):
 
 
 def get_code_object(code):
-    if code == "VASP":
-        return VaspParser()
-
-    if code == "QE":
-        return QEParser()
-
-    if code == "OpenMX":
-        return OpenmxParser()
-
-    if code == "xTAPP":
-        return XtappParser()
-
-    if code == "LAMMPS":
-        return LammpsParser()
+    return code_settings[code][2]()
 
 
 def displace(displacement_mode, codeobj, args):
@@ -262,6 +240,29 @@ def displace(displacement_mode, codeobj, args):
                             imag_evec=args.imag_evec)
 
 
+def generate_structures(codeobj, prefix, header_list, disp_list, nproc):
+
+    ndisp = len(disp_list)
+
+    if nproc == 1 or ndisp == 0:
+        codeobj.generate_structures(prefix, header_list, disp_list)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Each process writes a contiguous block of files
+    chunksize = -(-ndisp // nproc)
+
+    with ProcessPoolExecutor(max_workers=nproc) as executor:
+        futures = [executor.submit(codeobj.generate_structures, prefix,
+                                   header_list[i:i + chunksize],
+                                   disp_list[i:i + chunksize],
+                                   i + 1, ndisp)
+                   for i in range(0, ndisp, chunksize)]
+        for future in futures:
+            future.result()
+
+
 def print_displacement_stdout(disp_list, codeobj):
 
     lavec_transpose = codeobj.lattice_vector.transpose()
@@ -277,6 +278,10 @@ def print_displacement_stdout(disp_list, codeobj):
 
 if __name__ == '__main__':
 
+    # Block-buffer stdout also when it is attached to a terminal
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+
     args = parser.parse_args()
 
     if not args.print_disp_stdout:
@@ -306,7 +311,7 @@ if __name__ == '__main__':
         print(" Number of displacements        : %i" % len(disp_list))
         print("-----------------------------------------------------------------")
         print("")
-        codeobj.generate_structures(args.prefix, header_list, disp_list)
+        generate_structures(codeobj, args.prefix, header_list, disp_list, args.nproc)
         print("All input files are created.")
     else:
         print_displacement_stdout(disp_list, codeobj)
@@ -47,6 +47,7 @@ class QEParser(object):
         self._celldm = [None] * 6
         self._BOHR_TO_ANGSTROM = 0.5291772108
         self._RYDBERG_TO_EV = 13.60569253
+        self._OUTPUT_BUFFER_SIZE = 1 << 20
 
     def load_initial_structure(self, file_in):
 
@@ -69,11 +70,15 @@ class QEParser(object):
         self._set_system_info()
         self._initial_structure_loaded = True
 
-    def generate_structures(self, prefix, header_list, disp_list):
+    def generate_structures(self, prefix, header_list, disp_list,
+                            counter_start=1, npattern=None):
 
-        self._set_number_of_zerofill(len(disp_list))
+        if npattern is None:
+            npattern = len(disp_list)
+
+        self._set_number_of_zerofill(npattern)
         self._prefix = prefix
-        self._counter = 1
+        self._counter = counter_start
 
         for header, disp in zip(header_list, disp_list):
             self._generate_input(header, disp)
@@ -136,7 +141,7 @@ class QEParser(object):
 
         filename = self._prefix + str(self._counter).zfill(self._nzerofills) + ".pw.in"
 
-        with open(filename, 'w') as f:
+        with open(filename, 'w', buffering=self._OUTPUT_BUFFER_SIZE) as f:
             for entry in self._list_CONTROL:
                 f.write(entry)
             for entry in self._list_SYSTEM:
@@ -734,15 +739,7 @@ class QEParser(object):
 
     def _set_number_of_zerofill(self, npattern):
 
-        nzero = 1
-
-        while True:
-            npattern //= 10
-            if npattern == 0:
-                break
-            nzero += 1
-
-        self._nzerofills = nzero
+        self._nzerofills = len(str(max(npattern, 1)))
 
     def _set_unit_conversion_factor(self, str_unit):
 
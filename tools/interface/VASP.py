@@ -61,6 +61,7 @@ class VaspParser(object):
         self._print_born = False
         self._BOHR_TO_ANGSTROM = 0.5291772108
         self._RYDBERG_TO_EV = 13.60569253
+        self._OUTPUT_BUFFER_SIZE = 1 << 20
 
     def load_initial_structure(self, file_in):
 
@@ -112,11 +113,15 @@ class VaspParser(object):
         self._x_fractional = xf
         self._initial_structure_loaded = True
 
-    def generate_structures(self, prefix, header_list, disp_list):
+    def generate_structures(self, prefix, header_list, disp_list,
+                            counter_start=1, npattern=None):
 
-        self._set_number_of_zerofill(len(disp_list))
+        if npattern is None:
+            npattern = len(disp_list)
+
+        self._set_number_of_zerofill(npattern)
         self._prefix = prefix
-        self._counter = 1
+        self._counter = counter_start
 
         for header, disp in zip(header_list, disp_list):
             self._generate_input(header, disp)
@@ -179,7 +184,7 @@ class VaspParser(object):
 
         filename = self._prefix + str(self._counter).zfill(self._nzerofills) + ".POSCAR"
 
-        with open(filename, 'w') as f:
+        with open(filename, 'w', buffering=self._OUTPUT_BUFFER_SIZE) as f:
             f.write("%s\n" % header)
             f.write("%s\n" % "1.0")
             for i in range(3):
@@ -357,15 +362,7 @@ class VaspParser(object):
 
     def _set_number_of_zerofill(self, npattern):
 
-        nzero = 1
-
-        while True:
-            npattern //= 10
-            if npattern == 0:
-                break
-            nzero += 1
-
-        self._nzerofills = nzero
+        self._nzerofills = len(str(max(npattern, 1)))
 
     def _set_unit_conversion_factor(self, str_unit):
 
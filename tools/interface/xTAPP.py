@@ -35,6 +35,7 @@ class XtappParser(object):
         self._print_born = False
         self._BOHR_TO_ANGSTROM = 0.5291772108
         self._RYDBERG_TO_EV = 13.60569253
+        self._OUTPUT_BUFFER_SIZE = 1 << 20
 
     def load_initial_structure(self, file_in):
 
@@ -64,10 +65,15 @@ class XtappParser(object):
         self._header_part = str_header
         self._initial_structure_loaded = True
 
-    def generate_structures(self, prefix, header_list, disp_list):
+    def generate_structures(self, prefix, header_list, disp_list,
+                            counter_start=1, npattern=None):
 
-        self._set_number_of_zerofill(len(disp_list))
+        if npattern is None:
+            npattern = len(disp_list)
+
+        self._set_number_of_zerofill(npattern)
         self._prefix = prefix
+        self._counter = counter_start
 
         for header, disp in zip(header_list, disp_list):
             self._generate_input(header, disp)
@@ -98,7 +104,7 @@ class XtappParser(object):
 
         filename = self._prefix + str(self._counter).zfill(self._nzerofills) + ".cg"
 
-        with open(filename, 'w') as f:
+        with open(filename, 'w', buffering=self._OUTPUT_BUFFER_SIZE) as f:
 
             f.write("%s" % self._header_part)
             for i in range(self._nat):
@@ -138,15 +144,7 @@ class XtappParser(object):
 
     def _set_number_of_zerofill(self, npattern):
 
-        nzero = 1
-
-        while True:
-            npattern //= 10
-            if npattern == 0:
-                break
-            nzero += 1
-
-        self._nzerofills = nzero
+        self._nzerofills = len(str(max(npattern, 1)))
 
     @staticmethod
     def _read_tappinput(file_in, Bohr_to_Ang):